@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import email
 import hashlib
+import heapq
 import imaplib
 import json
+import operator
 import os
 import re
+import socket
+import sys
 from html import unescape
 from html.parser import HTMLParser
 from datetime import datetime, timedelta, timezone
@@ -13,41 +17,73 @@ from email.header import decode_header, make_header
 from email.policy import default
 from pathlib import Path
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_FILE = ROOT / "data" / "jobs.json"
 MAX_ITEM_AGE_DAYS = int(os.environ.get("MAX_ITEM_AGE_DAYS", "28"))
 DEADLINE_GRACE_DAYS = int(os.environ.get("DEADLINE_GRACE_DAYS", "5"))
+MAX_ITEMS = 500
+FETCH_BATCH_SIZE = 100
 DEFAULT_LINKEDIN_FOLDER = "Jobalerts_Linkedin"
+# Bump when the classification logic changes so stored items get rescored.
+SCHEMA_VERSION = 3
 NOISE_LINK_SUBSTRINGS = [
     "lists.fu-berlin.de/listinfo/ib-liste",
     "ib-liste@lists.fu-berlin.de",
     "lists.fu-berlin.de/private/ib-liste/attachments/",
 ]
 
-JOB_REGEX_PATTERNS = [
-    re.compile(r"\bjob\b", re.IGNORECASE),
-    re.compile(r"\bvacanc(?:y|ies)\b", re.IGNORECASE),
-    re.compile(r"\bopening\b", re.IGNORECASE),
-    re.compile(r"\bassistant professor\b", re.IGNORECASE),
-    re.compile(r"\bprofessur\b", re.IGNORECASE),
-    re.compile(r"\bstelle\b", re.IGNORECASE),
-    re.compile(r"\bstellenausschreibung\b", re.IGNORECASE),
-    re.compile(r"\bhilfskraft\b", re.IGNORECASE),
-    re.compile(r"\bpraktikum\b", re.IGNORECASE),
-    re.compile(r"\binternship\b", re.IGNORECASE),
-    re.compile(r"\bbewerbung\b", re.IGNORECASE),
-    re.compile(r"\bbewerbungsfrist\b", re.IGNORECASE),
-    re.compile(r"\bapply\b", re.IGNORECASE),
-    re.compile(r"\bpostdoc\b", re.IGNORECASE),
-    re.compile(r"\bphd\b", re.IGNORECASE),
-    re.compile(r"\bdoktorand(?:en|in)?stelle\b", re.IGNORECASE),
-]
+JOB_REGEX = re.compile(
+    r"\b(?:job|vacanc(?:y|ies)|opening|assistant professor|professur|stelle|stellenausschreibung|hilfskraft"
+    r"|praktikum|internship|bewerbung(?:sfrist)?|apply|postdoc|phd|doktorand(?:en|in)?stelle)\b"
+)
 
 DEADLINE_PATTERNS = [
     re.compile(r"apply by\s+([^\n\r.!?]+)", re.IGNORECASE),
     re.compile(r"bewerbungsfrist\s*[:\-]?\s*([^\n\r.!?]+)", re.IGNORECASE),
     re.compile(r"bis zum\s+([0-9]{1,2}\.[0-9]{1,2}\.[0-9]{2,4})", re.IGNORECASE),
 ]
+# One-pass prefilter; the ordered patterns above still decide which match wins.
+DEADLINE_RE = re.compile("|".join(p.pattern for p in DEADLINE_PATTERNS), re.IGNORECASE)
+
+TYPE_RE = re.compile(
+    r"(?P<AP>assistant professor)|(?P<PD>postdoc)|(?P<PHD>phd)|(?P<PROF>professur)"
+    r"|(?P<INT>praktikum|internship)|(?P<SA>hilfskraft)|(?P<POS>stelle|\bjob\b)"
+)
+# Ordered by priority; infer_type returns the highest-priority label found.
+TYPE_LABELS = {
+    "AP": "Assistant Professor",
+    "PD": "Postdoc",
+    "PHD": "PhD",
+    "PROF": "Professorship",
+    "INT": "Internship",
+    "SA": "Student Assistant",
+    "POS": "Position",
+}
+TYPE_PRIORITY = {group: rank for rank, group in enumerate(TYPE_LABELS)}
+
+HEADER_RE = {
+    name: re.compile(rf"^\s*{name}:\s*(.*)$", re.IGNORECASE) for name in ("Subject", "From", "Date")
+}
+ANY_HEADER_RE = re.compile(r"^\s*[A-Za-z][A-Za-z-]*:\s*")
+_WS_RE = re.compile(r"\s+")
+URL_RE = re.compile(r"https?://[^\s)>]+")
+ORG_RE = re.compile(r"(?:University|Universit[aä]t|Institut|Institute)\s+[^,\n.]*", re.IGNORECASE)
+COMMA_RE = re.compile(r",\s*([^,]+)$")
 
 PROFILE_DS_KEYWORDS = [
     "data science",
@@ -181,6 +217,33 @@ PROFILE_POLICY_KEYWORDS = [
 ]
 
 ISOLATED_ABBREVIATIONS = {"ml", "ai", "ki", "r"}
+ABBR_RE = re.compile(rf"\b({'|'.join(sorted(ISOLATED_ABBREVIATIONS))})\b")
+
+
+def normalize_keywords(keywords):
+    return tuple(sys.intern(k.strip().lower()) for k in keywords if k.strip())
+
+
+DS_KEYWORDS = normalize_keywords(PROFILE_DS_KEYWORDS)
+POLICY_KEYWORDS = normalize_keywords(PROFILE_POLICY_KEYWORDS)
+
+
+def build_keyword_automaton(keywords):
+    # Abbreviations need word boundaries, so they stay on the regex path.
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for k in keywords:
+        if k not in ISOLATED_ABBREVIATIONS:
+            automaton.add_word(k, k)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+DS_AUTO = build_keyword_automaton(DS_KEYWORDS)
+POLICY_AUTO = build_keyword_automaton(POLICY_KEYWORDS)
 
 ENGLISH_MONTHS = {
     "january": 1,
@@ -247,6 +310,11 @@ def parse_iso_datetime(value: str):
     return normalize_to_utc(dt)
 
 
+def item_timestamp(item: dict) -> float:
+    dt = parse_iso_datetime(item.get("dateUtc", "")) or parse_mail_date(item.get("date", ""))
+    return dt.timestamp() if dt else 0.0
+
+
 def parse_deadline_date(text: str, fallback_year: int = None):
     if not text:
         return None
@@ -321,44 +389,69 @@ def decode_text_part(part: email.message.Message) -> str:
 
 def extract_text_body(msg: email.message.Message) -> str:
     if msg.is_multipart():
-        html_body = ""
+        # Depth-first in walk() order, stopping at the first HTML part since it is preferred.
         plain_body = ""
-        for part in msg.walk():
+        stack = [msg]
+        while stack:
+            part = stack.pop()
             if part.is_multipart():
+                stack.extend(reversed(part.get_payload()))
                 continue
             ctype = part.get_content_type()
             disp = (part.get("Content-Disposition") or "").lower()
             if "attachment" in disp:
                 continue
-            if ctype not in {"text/plain", "text/html"}:
-                continue
-            decoded = decode_text_part(part).strip()
-            if not decoded:
-                continue
-            if ctype == "text/html" and not html_body:
-                html_body = decoded
+            if ctype == "text/html":
+                decoded = decode_text_part(part).strip()
+                if decoded:
+                    return decoded
             elif ctype == "text/plain" and not plain_body:
-                plain_body = decoded
-        return html_body or plain_body
+                plain_body = decode_text_part(part).strip()
+        return plain_body
 
     return decode_text_part(msg)
 
 
 def split_messages(raw_text: str):
     normalized = raw_text.replace("\r", "")
+    # Single mails have no digest markers; skip the regex split for them.
+    if "Message:" not in normalized:
+        return [normalized]
     chunks = re.split(r"\n(?=\s*Message:\s+\d+\n)", normalized)
     filtered = [c for c in chunks if re.search(r"^\s*Message:\s+\d+", c, re.MULTILINE)]
     return filtered if filtered else [normalized]
 
 
-def html_to_text(raw_html: str) -> str:
+def strip_html_tags(raw_html: str) -> str:
+    if LexborHTMLParser is not None:
+        # A space before every tag mirrors the regex path below, which turns tags into spaces;
+        # it also keeps text apart when the parser drops stray tags such as a bare <td>.
+        tree = LexborHTMLParser(raw_html.replace("<", " <"))
+        for node in tree.css("script, style"):
+            node.decompose()
+        for node in tree.css("br"):
+            node.replace_with("\n")
+        for node in tree.css("p, div, li, tr, h1, h2, h3, h4, h5, h6"):
+            node.insert_after("\n")
+        for node in tree.css("li"):
+            # NUL never survives parsing, so it safely marks where the bullet replaces the tag's space.
+            node.insert_before("\x00")
+        root = tree.root
+        if root is None:
+            return ""
+        return re.sub(r" ?\x00", "- ", root.text(separator=""))
+
     text = raw_html
     text = re.sub(r"(?is)<(script|style)\b.*?>.*?</\1>", " ", text)
     text = re.sub(r"(?i)<br\s*/?>", "\n", text)
     text = re.sub(r"(?i)</(p|div|li|tr|h[1-6])>", "\n", text)
     text = re.sub(r"(?i)<li\b[^>]*>", "- ", text)
     text = re.sub(r"(?is)<[^>]+>", " ", text)
-    text = unescape(text)
+    return unescape(text)
+
+
+def html_to_text(raw_html: str) -> str:
+    text = strip_html_tags(raw_html)
     text = text.replace("\xa0", " ")
     text = re.sub(r"[\u200b-\u200f\u202a-\u202e\u2060\ufeff\u034f]", "", text)
     text = re.sub(r"[ \t]+\n", "\n", text)
@@ -368,8 +461,7 @@ def html_to_text(raw_html: str) -> str:
 
 def extract_header(block: str, name: str) -> str:
     lines = block.replace("\r", "").split("\n")
-    header_re = re.compile(rf"^\s*{re.escape(name)}:\s*(.*)$", re.IGNORECASE)
-    any_header_re = re.compile(r"^\s*[A-Za-z][A-Za-z-]*:\s*")
+    header_re = HEADER_RE.get(name) or re.compile(rf"^\s*{re.escape(name)}:\s*(.*)$", re.IGNORECASE)
 
     for idx, line in enumerate(lines):
         match = header_re.match(line)
@@ -384,7 +476,7 @@ def extract_header(block: str, name: str) -> str:
             if not stripped:
                 j += 1
                 continue
-            if any_header_re.match(stripped):
+            if ANY_HEADER_RE.match(stripped):
                 break
             if nxt.startswith((" ", "\t")):
                 value_parts.append(stripped)
@@ -392,33 +484,36 @@ def extract_header(block: str, name: str) -> str:
                 continue
             break
 
-        return re.sub(r"\s+", " ", " ".join(value_parts)).strip()
+        return _WS_RE.sub(" ", " ".join(value_parts)).strip()
 
     return ""
 
 
 def extract_body(block: str) -> str:
-    lines = block.replace("\r", "").split("\n")
-    header_re = re.compile(r"^\s*[A-Za-z][A-Za-z-]*:\s*")
+    text = block.replace("\r", "")
 
-    idx = 0
+    # Walk line offsets so the body is a single slice rather than a rejoined list.
+    start = 0
     seen_header = False
-    while idx < len(lines):
-        line = lines[idx]
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        line = text[start:end]
         stripped = line.strip()
         if not stripped:
-            idx += 1
+            start = end + 1
             continue
-        if header_re.match(stripped):
+        if ANY_HEADER_RE.match(stripped):
             seen_header = True
-            idx += 1
+            start = end + 1
             continue
         if line.startswith((" ", "\t")) and seen_header:
-            idx += 1
+            start = end + 1
             continue
         break
 
-    body = "\n".join(lines[idx:]).strip()
+    body = text[start:].strip()
     if not body:
         body = block.strip()
     return body
@@ -431,10 +526,11 @@ def clean_subject(subject: str) -> str:
 
 
 def infer_deadline(text: str) -> str:
-    for pattern in DEADLINE_PATTERNS:
-        m = pattern.search(text)
-        if m and m.group(1):
-            return m.group(1).strip()
+    if DEADLINE_RE.search(text):
+        for pattern in DEADLINE_PATTERNS:
+            m = pattern.search(text)
+            if m and m.group(1):
+                return m.group(1).strip()
 
     contextual = re.search(
         r"(?:deadline|application deadline|apply by|bewerbungsfrist|bewerbungsschluss|frist|bis zum)\s*[:\-]?\s*([^\n\r.!?]{0,80})",
@@ -447,40 +543,31 @@ def infer_deadline(text: str) -> str:
     return "Not found"
 
 
-def infer_type(text: str, is_job_post: bool = False) -> str:
+def infer_type(lower: str, is_job_post: bool = False) -> str:
     if not is_job_post:
         return "N/A"
-    lower = text.lower()
-    if "assistant professor" in lower:
-        return "Assistant Professor"
-    if "postdoc" in lower:
-        return "Postdoc"
-    if "phd" in lower:
-        return "PhD"
-    if "professur" in lower:
-        return "Professorship"
-    if "praktikum" in lower or "internship" in lower:
-        return "Internship"
-    if "hilfskraft" in lower:
-        return "Student Assistant"
-    if "stelle" in lower or re.search(r"\bjob\b", text, flags=re.IGNORECASE):
-        return "Position"
-    return "N/A"
+    best = None
+    for m in TYPE_RE.finditer(lower):
+        if best is None or TYPE_PRIORITY[m.lastgroup] < TYPE_PRIORITY[best]:
+            best = m.lastgroup
+            if TYPE_PRIORITY[best] == 0:
+                break
+    return TYPE_LABELS[best] if best else "N/A"
 
 
 def infer_org(subject: str, body: str) -> str:
     combined = f"{subject}\n{body}"
-    uni = re.search(r"(?:University|Universit[aä]t|Institut|Institute)\s+[^,\n.]*", combined, re.IGNORECASE)
+    uni = ORG_RE.search(combined)
     if uni:
         return uni.group(0).strip()
-    comma_subject = re.search(r",\s*([^,]+)$", subject)
+    comma_subject = COMMA_RE.search(subject)
     if comma_subject:
         return comma_subject.group(1).strip()
     return "Unknown"
 
 
-def is_job(text: str) -> bool:
-    return any(pattern.search(text) for pattern in JOB_REGEX_PATTERNS)
+def is_job(lower: str) -> bool:
+    return JOB_REGEX.search(lower) is not None
 
 
 def is_linkedin_item(subject: str, sender: str, body: str, source_tag: str = "", source_folder: str = "") -> bool:
@@ -646,10 +733,10 @@ def looks_like_legacy_linkedin_alert(item: dict) -> bool:
     return not has_direct_linkedin_job_link(item)
 
 
-def classify_ds_policy_fit(text: str):
-    lower = text.lower()
-    ds_hits = [k for k in PROFILE_DS_KEYWORDS if keyword_matches(lower, k)]
-    policy_hits = [k for k in PROFILE_POLICY_KEYWORDS if keyword_matches(lower, k)]
+def classify_ds_policy_fit(lower: str):
+    abbr_hits = {m.group(1) for m in ABBR_RE.finditer(lower)}
+    ds_hits = keyword_hits(lower, DS_KEYWORDS, DS_AUTO, abbr_hits)
+    policy_hits = keyword_hits(lower, POLICY_KEYWORDS, POLICY_AUTO, abbr_hits)
     score = len(ds_hits) + len(policy_hits)
     is_match = len(ds_hits) >= 1 and len(policy_hits) >= 1 and score >= 2
     return {
@@ -659,13 +746,40 @@ def classify_ds_policy_fit(text: str):
     }
 
 
-def keyword_matches(lower_text: str, keyword: str) -> bool:
-    k = keyword.strip().lower()
-    if not k:
-        return False
-    if k in ISOLATED_ABBREVIATIONS:
-        return bool(re.search(rf"\b{re.escape(k)}\b", lower_text, flags=re.IGNORECASE))
-    return k in lower_text
+def keyword_hits(lower_text: str, keywords, automaton, abbr_hits):
+    if automaton is None:
+        return [k for k in keywords if keyword_matches(lower_text, k, abbr_hits)]
+    found = {keyword for _, keyword in automaton.iter(lower_text)}
+    return [k for k in keywords if k in found or k in abbr_hits]
+
+
+def keyword_matches(lower_text: str, keyword: str, abbr_hits) -> bool:
+    if keyword in ISOLATED_ABBREVIATIONS:
+        return keyword in abbr_hits
+    return keyword in lower_text
+
+
+def fingerprint_id(fingerprint_source: str) -> str:
+    return hashlib.blake2b(fingerprint_source.encode("utf-8", errors="ignore"), digest_size=8).hexdigest()
+
+
+def legacy_fingerprint_id(fingerprint_source: str) -> str:
+    # Ids stored before the switch to blake2b; needed until those items age out of the feed.
+    return hashlib.sha1(fingerprint_source.encode("utf-8", errors="ignore")).hexdigest()[:16]
+
+
+def migrate_legacy_id(item: dict) -> None:
+    links = item.get("links") or []
+    first_link = links[0] if links else ""
+    tails = [first_link]
+    job_id_match = re.search(r"/jobs/view/(\d+)", first_link)
+    if job_id_match:
+        tails.append(job_id_match.group(1))
+    for tail in tails:
+        fingerprint_source = f"{item.get('subject', '')}|{item.get('from', '')}|{item.get('date', '')}|{tail}"
+        if legacy_fingerprint_id(fingerprint_source) == item.get("id"):
+            item["id"] = fingerprint_id(fingerprint_source)
+            return
 
 
 def parse_digest_text(
@@ -686,15 +800,15 @@ def parse_digest_text(
                 title = job["title"]
                 meta = job.get("meta", "")
                 body = f"{title}\n{meta}".strip()
-                text = f"{title}\n{body}"
-                fit = classify_ds_policy_fit(text)
+                lower = f"{title}\n{body}".lower()
+                fit = classify_ds_policy_fit(lower)
                 item = {
                     "subject": clean_subject(title),
                     "from": fallback_from or "LinkedIn Job Alerts",
                     "date": fallback_date or "Unknown",
                     "dateUtc": (parsed_mail_dt.isoformat() if parsed_mail_dt else None),
                     "organization": job.get("organization", "Unknown"),
-                    "positionType": infer_type(text, True),
+                    "positionType": infer_type(lower, True),
                     "deadline": "Not found",
                     "deadlineDate": None,
                     "links": [job["url"]],
@@ -706,9 +820,11 @@ def parse_digest_text(
                     "isDsPolicyFit": fit["isDsPolicyFit"],
                     "dsPolicyScore": fit["dsPolicyScore"],
                     "dsPolicyMatchedKeywords": fit["dsPolicyMatchedKeywords"],
+                    "_v": SCHEMA_VERSION,
+                    "_ts": (parsed_mail_dt.timestamp() if parsed_mail_dt else 0.0),
                 }
                 fingerprint_source = f"{item['subject']}|{item['from']}|{item['date']}|{job.get('job_id', idx)}"
-                item["id"] = hashlib.sha1(fingerprint_source.encode("utf-8", errors="ignore")).hexdigest()[:16]
+                item["id"] = fingerprint_id(fingerprint_source)
                 items.append(item)
             return items
 
@@ -722,10 +838,11 @@ def parse_digest_text(
         date = extract_header(block, "Date") or (fallback_date if idx == 1 and fallback_date else "Unknown")
         body = extract_body(block)
         text = f"{subject}\n{body}"
-        links = clean_links(re.findall(r"https?://[^\s)>]+", body))
-        fit = classify_ds_policy_fit(text)
+        lower = text.lower()
+        links = clean_links(m.group(0) for m in URL_RE.finditer(body))
+        fit = classify_ds_policy_fit(lower)
         linkedin_item = is_linkedin_item(subject, sender, body, source_tag=source_tag, source_folder=source_folder)
-        is_job_post = is_job(text) or linkedin_item
+        is_job_post = is_job(lower) or linkedin_item
         parsed_mail_dt = parse_mail_date(date)
         deadline_text = infer_deadline(text)
         deadline_date = parse_deadline_date(
@@ -739,7 +856,7 @@ def parse_digest_text(
             "date": date,
             "dateUtc": (parsed_mail_dt.isoformat() if parsed_mail_dt else None),
             "organization": infer_org(subject, body),
-            "positionType": infer_type(text, is_job_post),
+            "positionType": infer_type(lower, is_job_post),
             "deadline": deadline_text,
             "deadlineDate": (deadline_date.isoformat() if deadline_date else None),
             "links": links,
@@ -751,9 +868,11 @@ def parse_digest_text(
             "isDsPolicyFit": fit["isDsPolicyFit"],
             "dsPolicyScore": fit["dsPolicyScore"],
             "dsPolicyMatchedKeywords": fit["dsPolicyMatchedKeywords"],
+            "_v": SCHEMA_VERSION,
+            "_ts": (parsed_mail_dt.timestamp() if parsed_mail_dt else 0.0),
         }
         fingerprint_source = f"{item['subject']}|{item['from']}|{item['date']}|{(links[0] if links else '')}"
-        item["id"] = hashlib.sha1(fingerprint_source.encode("utf-8", errors="ignore")).hexdigest()[:16]
+        item["id"] = fingerprint_id(fingerprint_source)
         items.append(item)
 
     return items
@@ -762,11 +881,16 @@ def parse_digest_text(
 def load_existing():
     if not DATA_FILE.exists():
         return {"generated_at": None, "source": "imap", "items": []}
+    if orjson is not None:
+        return orjson.loads(DATA_FILE.read_bytes())
     return json.loads(DATA_FILE.read_text(encoding="utf-8"))
 
 
 def save_payload(payload):
     DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        DATA_FILE.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        return
     DATA_FILE.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
 
@@ -826,12 +950,7 @@ def fetch_messages_from_folder(
             break
 
     results = []
-    for msg_id in ids:
-        status, fetched = conn.fetch(msg_id, "(BODY.PEEK[])")
-        if status != "OK" or not fetched:
-            continue
-
-        raw_bytes = fetched[0][1]
+    for raw_bytes in fetch_raw_messages(conn, ids, source_tag=source_tag):
         msg = email.message_from_bytes(raw_bytes, policy=default)
         subject = decode_mime(msg.get("Subject", ""))
         sender = decode_mime(msg.get("From", ""))
@@ -857,6 +976,30 @@ def fetch_messages_from_folder(
     return results
 
 
+def fetch_raw_messages(conn: imaplib.IMAP4_SSL, ids, source_tag: str = "imap"):
+    # One FETCH per batch of ids instead of one round-trip per message.
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        batch = ids[start : start + FETCH_BATCH_SIZE]
+        message_set = b",".join(batch)
+        status, fetched = conn.fetch(message_set, "(BODY.PEEK[])")
+        if status == "OK" and fetched:
+            for part in fetched:
+                if isinstance(part, tuple):
+                    yield part[1]
+            continue
+
+        # Fall back to single fetches so one bad message does not drop the whole batch.
+        print(f"imap_fetch_failed[{source_tag}]={message_set.decode('utf-8', errors='ignore')}")
+        for msg_id in batch:
+            status, fetched = conn.fetch(msg_id, "(BODY.PEEK[])")
+            if status != "OK" or not fetched:
+                print(f"imap_fetch_failed[{source_tag}]={msg_id.decode('utf-8', errors='ignore')}")
+                continue
+            for part in fetched:
+                if isinstance(part, tuple):
+                    yield part[1]
+
+
 def fetch_messages():
     host = os.environ["IMAP_HOST"]
     port = int(os.environ.get("IMAP_PORT", "993"))
@@ -872,6 +1015,10 @@ def fetch_messages():
     linkedin_subject_filter = os.environ.get("LINKEDIN_SUBJECT_FILTER", "").strip()
 
     conn = imaplib.IMAP4_SSL(host, port)
+    try:
+        conn.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
     conn.login(user, password)
 
     try:
@@ -905,6 +1052,10 @@ def fetch_messages():
 def main():
     existing = load_existing()
     existing_items = existing.get("items", [])
+    # Items written before the current schema may still carry sha1-based ids.
+    for item in existing_items:
+        if item.get("_v") != SCHEMA_VERSION:
+            migrate_legacy_id(item)
     known_ids = {item.get("id") for item in existing_items if item.get("id")}
 
     mails = fetch_messages()
@@ -929,22 +1080,27 @@ def main():
             known_ids.add(item["id"])
             new_items.append(item)
 
-    def item_date_for_sort(item):
-        dt = parse_iso_datetime(item.get("dateUtc", "")) or parse_mail_date(item.get("date", ""))
-        return dt or datetime.min.replace(tzinfo=timezone.utc)
+    # Parse each date once; sorting and pruning compare the cached epoch seconds.
+    for item in existing_items:
+        item["_ts"] = item_timestamp(item)
+    by_ts = operator.itemgetter("_ts")
 
-    merged = sorted(existing_items + new_items, key=item_date_for_sort, reverse=True)
+    # existing_items was saved newest-first, so only the new items need sorting.
+    new_items.sort(key=by_ts, reverse=True)
+    merged = list(heapq.merge(existing_items, new_items, key=by_ts, reverse=True))
     for item in merged:
-        text = "\n".join(
+        if item.get("_v") == SCHEMA_VERSION and "isDsPolicyFit" in item:
+            continue
+        lower = "\n".join(
             [
                 item.get("subject", ""),
                 item.get("snippet", ""),
                 item.get("organization", ""),
                 item.get("positionType", ""),
             ]
-        )
-        item["isJob"] = is_job(text)
-        item["positionType"] = infer_type(text, bool(item.get("isJob")))
+        ).lower()
+        item["isJob"] = is_job(lower)
+        item["positionType"] = infer_type(lower, bool(item.get("isJob")))
         item["isLinkedInJob"] = bool(
             item.get("isLinkedInJob")
             or is_linkedin_item(
@@ -957,9 +1113,9 @@ def main():
         )
         if item["isLinkedInJob"] and not item["isJob"]:
             item["isJob"] = True
-            item["positionType"] = infer_type(text, True)
+            item["positionType"] = infer_type(lower, True)
         if "isDsPolicyFit" not in item or "dsPolicyScore" not in item:
-            fit = classify_ds_policy_fit(text)
+            fit = classify_ds_policy_fit(lower)
             item["isDsPolicyFit"] = fit["isDsPolicyFit"]
             item["dsPolicyScore"] = fit["dsPolicyScore"]
             item["dsPolicyMatchedKeywords"] = fit["dsPolicyMatchedKeywords"]
@@ -974,6 +1130,7 @@ def main():
             )
             item["deadlineDate"] = deadline_date.isoformat() if deadline_date else None
         item["links"] = clean_links(item.get("links", []))
+        item["_v"] = SCHEMA_VERSION
 
     # Remove legacy "combined alert" LinkedIn entries.
     cleaned = []
@@ -986,14 +1143,13 @@ def main():
     merged = cleaned
 
     now_utc = datetime.now(timezone.utc)
-    min_date_utc = now_utc - timedelta(days=MAX_ITEM_AGE_DAYS)
+    min_ts = (now_utc - timedelta(days=MAX_ITEM_AGE_DAYS)).timestamp()
     latest_allowed_deadline = (now_utc - timedelta(days=DEADLINE_GRACE_DAYS)).date()
     pruned = []
     removed_by_age = 0
     removed_by_deadline = 0
     for item in merged:
-        item_dt = parse_iso_datetime(item.get("dateUtc", "")) or parse_mail_date(item.get("date", ""))
-        if item_dt and item_dt < min_date_utc:
+        if item["_ts"] and item["_ts"] < min_ts:
             removed_by_age += 1
             continue
         deadline_date = None
@@ -1007,14 +1163,17 @@ def main():
             removed_by_deadline += 1
             continue
         pruned.append(item)
+    kept = pruned[:MAX_ITEMS]
+    for item in kept:
+        item.pop("_ts", None)
 
     payload = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "source": "imap",
-        "items": pruned[:500],
+        "items": kept,
         "stats": {
             "new_items": len(new_items),
-            "total_items": len(pruned[:500]),
+            "total_items": len(kept),
             "processed_messages": len(mails),
             "processed_messages_imap": source_counts.get("imap", 0),
             "processed_messages_linkedin": source_counts.get("linkedin", 0),